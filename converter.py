@@ -1,7 +1,67 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import codecs
 import json
+import logging
 import os
 
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Directory containing this script and the HTML files to convert
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Metadata keys in the JSON output and the meta tag names they are read from
+_META_FIELDS = {
+    "identifier": 'dcterms.identifier',
+    "language": 'dcterms.language',
+    "publisher": 'dcterms.publisher',
+    "date": 'dcterms.date',
+    "creator": 'dcterms.creator'
+}
+_META_NAMES = tuple(_META_FIELDS.values())
+
+_UNTITLED = "Untitled Document"
+
+# Only build tree nodes for the tags the converter reads; everything
+# nested inside a matching tag (e.g. a section's labels) is kept as well
+STRAINER = SoupStrainer(['title', 'meta', 'section'])
+
+def _detect_encoding(html_content):
+    """
+    Pick the encoding of raw HTML bytes
+    
+    Args:
+        html_content (bytes): Raw HTML content
+    
+    Returns:
+        str: 'utf-8' if the bytes decode as UTF-8, otherwise the declared
+        charset if there is a usable one, otherwise 'iso-8859-1' (lxml
+        does not recognise Python's 'latin-1' alias and falls back to UTF-8)
+    """
+    try:
+        html_content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    
+    declared = EncodingDetector.find_declared_encoding(html_content, is_html=True)
+    if declared:
+        try:
+            html_content.decode(declared)
+            if codecs.lookup(declared).name != 'iso8859-1':
+                return declared
+        except (LookupError, UnicodeDecodeError):
+            pass
+    
+    return 'iso-8859-1'
+
 def convert_html_to_json(filename):
     """
     Convert HTML file to JSON format
@@ -12,56 +72,58 @@ def convert_html_to_json(filename):
     Returns:
         dict: JSON representation of the HTML content
     """
-    # Get the current directory and construct file path
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, filename)
+    file_path = os.path.join(_MODULE_DIR, filename)
     
-    # Check if file exists
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"HTML file '{filename}' not found in the current directory")
-    
-    # Read HTML content from file
+    # Read raw HTML bytes from file
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-    except UnicodeDecodeError:
-        # Try with different encoding if UTF-8 fails
-        with open(file_path, 'r', encoding='latin-1') as file:
+        with open(file_path, 'rb', buffering=1 << 20) as file:
             html_content = file.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"HTML file '{filename}' not found in the current directory") from None
     
     # Check if we actually read HTML content
     if not html_content or len(html_content.strip()) == 0:
         raise ValueError(f"The file '{filename}' appears to be empty")
     
-    print(f"Successfully read {len(html_content)} characters from {filename}")
+    logger.debug("Successfully read %d bytes from %s", len(html_content), filename)
+    
+    # Tell lxml the encoding up front; without a declaration it would
+    # read latin-1 files as UTF-8 and substitute replacement characters
+    encoding = _detect_encoding(html_content)
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml', from_encoding=encoding, parse_only=STRAINER)
    
     # Extract metadata with error handling
     metadata = {}
-    meta_fields = {
-        "identifier": 'dcterms.identifier',
-        "language": 'dcterms.language',
-        "publisher": 'dcterms.publisher',
-        "date": 'dcterms.date',
-        "creator": 'dcterms.creator'
-    }
     
-    for key, meta_name in meta_fields.items():
-        meta_tag = soup.find('meta', {'name': meta_name})
-        if meta_tag and meta_tag.get('content'):
-            metadata[key] = meta_tag['content']
+    # Index the dcterms meta tags in one traversal, keeping the first of each name
+    meta_contents = {}
+    for meta_tag in soup.find_all('meta', attrs={'name': _META_NAMES}):
+        meta_contents.setdefault(meta_tag['name'], meta_tag.get('content'))
+    
+    for key, meta_name in _META_FIELDS.items():
+        content = meta_contents.get(meta_name)
+        if content:
+            metadata[key] = content
         else:
             metadata[key] = None
-            print(f"Warning: Meta tag '{meta_name}' not found or empty")
+            logger.warning("Meta tag '%s' not found or empty in %s", meta_name, filename)
    
     # Extract sections
     sections = []
     for section in soup.find_all('section'):
+        # Collect the header and labels in a single pass over the section
+        header = None
+        labels = []
+        for element in section.descendants:
+            if element.name == 'label':
+                labels.append(element)
+            elif element.name == 'header' and header is None:
+                header = element
+        
         # Get section name with fallback options
         section_name = section.get('data-section-name')
         if not section_name:
-            header = section.find('header')
             section_name = header.text.strip() if header else f"Section {len(sections) + 1}"
         
         section_data = {
@@ -71,7 +133,7 @@ def convert_html_to_json(filename):
        
         # Process form elements
         question_id = 0
-        for label in section.find_all('label'):
+        for label in labels:
             question = {
                 "id": question_id,
                 "label": label.text.strip(),
@@ -84,7 +146,7 @@ def convert_html_to_json(filename):
    
     # Get title with fallback
     title_tag = soup.find('title')
-    title = title_tag.text.strip() if title_tag else "Untitled Document"
+    title = title_tag.text.strip() if title_tag else _UNTITLED
     
     return {
         "title": title,
@@ -103,21 +165,52 @@ def save_json_output(data, output_filename=None):
     if output_filename is None:
         output_filename = "converted_output.json"
     
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(output_filename, 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
     
-    print(f"JSON output saved to: {output_filename}")
+    logger.debug("JSON output saved to: %s", output_filename)
+
+def _convert_one(html_filename):
+    """
+    Convert a single HTML file and save the result as JSON
+    
+    Args:
+        html_filename (str): Name of the HTML file in the same folder
+    
+    Returns:
+        str: Summary of the conversion, printed by the main process
+    """
+    result = convert_html_to_json(html_filename)
+    
+    # Save to JSON file
+    output_name = html_filename.replace('.html', '.json')
+    save_json_output(result, output_name)
+    
+    total_questions = sum(len(section['questions']) for section in result['sections'])
+    return "\n".join([
+        f"✓ Successfully converted '{html_filename}'",
+        f"  - Title: {result['title']}",
+        f"  - Sections: {len(result['sections'])}",
+        f"  - Total questions: {total_questions}",
+        f"  - Output: {output_name}",
+    ])
 
 def convert_all_html_files():
     """
     Convert all HTML files in the current directory to JSON
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    html_files = [f for f in os.listdir(current_dir) if f.endswith('.html')]
+    with os.scandir(_MODULE_DIR) as it:
+        entries = list(it)
+    html_files = [entry.name for entry in entries
+                  if entry.name.endswith('.html') and entry.is_file()]
     
     if not html_files:
         print("No HTML files found in the current directory.")
-        print(f"Available files: {os.listdir(current_dir)}")
+        print(f"Available files: {[entry.name for entry in entries]}")
         return
     
     print(f"Found {len(html_files)} HTML files: {html_files}")
@@ -126,49 +219,50 @@ def convert_all_html_files():
     successful_conversions = 0
     failed_conversions = 0
     
-    for i, html_filename in enumerate(html_files, 1):
-        print(f"\n[{i}/{len(html_files)}] Processing: {html_filename}")
-        print("-" * 40)
+    # Files are independent, so convert them in parallel worker processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(_convert_one, html_filename): html_filename
+                   for html_filename in html_files}
         
-        try:
-            result = convert_html_to_json(html_filename)
+        for i, future in enumerate(as_completed(futures), 1):
+            html_filename = futures[future]
             
-            # Save to JSON file
-            output_name = html_filename.replace('.html', '.json')
-            save_json_output(result, output_name)
+            try:
+                summary = future.result()
+                successful_conversions += 1
+                
+            except Exception as e:
+                summary = f"✗ Failed to convert '{html_filename}': {e}"
+                failed_conversions += 1
+                # Optionally log full traceback for debugging
+                # logger.exception("Conversion of %s failed", html_filename)
             
-            # Print summary of this file
-            print(f"✓ Successfully converted '{html_filename}'")
-            print(f"  - Title: {result['title']}")
-            print(f"  - Sections: {len(result['sections'])}")
-            total_questions = sum(len(section['questions']) for section in result['sections'])
-            print(f"  - Total questions: {total_questions}")
-            print(f"  - Output: {output_name}")
-            
-            successful_conversions += 1
-            
-        except Exception as e:
-            print(f"✗ Failed to convert '{html_filename}': {e}")
-            failed_conversions += 1
-            # Optionally print full traceback for debugging
-            # import traceback
-            # traceback.print_exc()
+            # Print the summary of this file in a single write
+            print(f"\n[{i}/{len(html_files)}] Processed: {html_filename}\n{'-' * 40}\n{summary}")
     
     # Final summary
-    print("\n" + "="*60)
-    print("CONVERSION SUMMARY")
-    print("="*60)
-    print(f"Total files processed: {len(html_files)}")
-    print(f"Successful conversions: {successful_conversions}")
-    print(f"Failed conversions: {failed_conversions}")
+    summary_lines = [
+        "\n" + "="*60,
+        "CONVERSION SUMMARY",
+        "="*60,
+        f"Total files processed: {len(html_files)}",
+        f"Successful conversions: {successful_conversions}",
+        f"Failed conversions: {failed_conversions}",
+    ]
     
     if successful_conversions > 0:
-        print(f"\nJSON files created:")
+        summary_lines.append("\nJSON files created:")
+        # JSON files are written relative to the working directory
+        with os.scandir() as it:
+            existing_files = {entry.name for entry in it if entry.is_file()}
         for html_file in html_files:
             json_file = html_file.replace('.html', '.json')
-            if os.path.exists(json_file):
-                print(f"  - {json_file}")
+            if json_file in existing_files:
+                summary_lines.append(f"  - {json_file}")
+    
+    print("\n".join(summary_lines))
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     convert_all_html_files()
\ No newline at end of file
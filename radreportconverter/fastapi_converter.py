@@ -1,34 +1,201 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from bs4 import BeautifulSoup
+from fastapi import FastAPI, File, UploadFile, HTTPException, Response
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+from selectolax.lexbor import LexborHTMLParser
+from collections import OrderedDict
+import hashlib
 import json
+import orjson
 from typing import Dict, Any
 
 app = FastAPI(title="HTML to JSON Converter", version="1.0.0")
 
-def convert_html_to_json(html_content: str) -> Dict[str, Any]:
+# Metadata keys in the JSON output and the meta tag names they are read from
+_META_FIELDS = {
+    "identifier": 'dcterms.identifier',
+    "language": 'dcterms.language',
+    "publisher": 'dcterms.publisher',
+    "date": 'dcterms.date',
+    "creator": 'dcterms.creator'
+}
+_META_NAMES = tuple(_META_FIELDS.values())
+
+_UNTITLED = "Untitled Document"
+
+# Only build tree nodes for the tags the BeautifulSoup fallback reads;
+# everything nested inside a matching tag is kept as well
+STRAINER = SoupStrainer(['title', 'meta', 'section'])
+
+# Serialized results of recent uploads, keyed by a hash of their content
+RESULT_CACHE_SIZE = 128
+_result_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+
+def convert_html_to_json(html_content: bytes) -> Dict[str, Any]:
     """Convert HTML content to JSON format"""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Lexbor always reads bytes as UTF-8, so decode them here first
+    html_text = _decode_html(html_content)
+    try:
+        return _convert_with_selectolax(html_text)
+    except Exception:
+        # Fall back to BeautifulSoup for HTML selectolax cannot handle
+        return _convert_with_bs4(html_text)
+
+def _decode_html(html_bytes: bytes) -> str:
+    """Decode HTML bytes as UTF-8, else as the declared charset, else as latin-1"""
+    try:
+        return html_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    
+    declared = EncodingDetector.find_declared_encoding(html_bytes, is_html=True)
+    if declared:
+        try:
+            return html_bytes.decode(declared)
+        except (LookupError, UnicodeDecodeError):
+            pass
+    
+    return html_bytes.decode('latin-1')
+
+def _convert_with_selectolax(html_content: str) -> Dict[str, Any]:
+    """Convert HTML content to JSON format using selectolax"""
+    tree = LexborHTMLParser(html_content)
    
     # Extract metadata
     metadata = {}
-    meta_fields = {
-        "identifier": 'dcterms.identifier',
-        "language": 'dcterms.language',
-        "publisher": 'dcterms.publisher',
-        "date": 'dcterms.date',
-        "creator": 'dcterms.creator'
+    # Index all named meta tags in one query, keeping the first of each name
+    meta_contents = {}
+    for meta_tag in tree.css('meta[name]'):
+        meta_contents.setdefault(meta_tag.attributes['name'], meta_tag.attributes.get('content'))
+    
+    for key, meta_name in _META_FIELDS.items():
+        content = meta_contents.get(meta_name)
+        metadata[key] = content if content else None
+   
+    # Extract sections
+    sections = []
+    for section in tree.css('section'):
+        # Collect headers, labels and textareas with a single query
+        header = None
+        textareas = []
+        labels = []
+        labels_by_for = {}
+        for element in section.css('header, label, textarea'):
+            if element.tag == 'textarea':
+                textareas.append(element)
+            elif element.tag == 'label':
+                labels.append(element)
+                labels_by_for.setdefault(element.attributes.get('for'), element)
+            elif header is None:
+                header = element
+        
+        section_name = section.attributes.get('data-section-name')
+        if not section_name:
+            section_name = header.text().strip() if header else f"Section {len(sections) + 1}"
+        
+        section_data = {
+            "name": section_name,
+            "questions": []
+        }
+       
+        question_id = 0
+        
+        # Handle textareas (medical report style)
+        if textareas:
+            for textarea in textareas:
+                textarea_id = textarea.attributes.get('id') or ''
+                label_element = labels_by_for.get(textarea_id)
+                label_text = label_element.text().strip() if label_element else ""
+                if not label_text:
+                    label_text = section_name
+                default_content = textarea.text().strip()
+                
+                # Default only when the attribute is missing; Lexbor reports a
+                # valueless attribute as None where BeautifulSoup gives ''
+                attributes = textarea.attributes
+                if 'data-field-type' in attributes:
+                    field_type = attributes['data-field-type'] or ''
+                else:
+                    field_type = 'TEXTAREA'
+                
+                question = {
+                    "id": question_id,
+                    "label": label_text,
+                    "answer": default_content,
+                    "field_type": field_type,
+                    "element_id": textarea_id
+                }
+                section_data["questions"].append(question)
+                question_id += 1
+        
+        # Handle labels (original form style)
+        else:
+            for label in labels:
+                label_text = label.text().strip()
+                if label_text:
+                    question = {
+                        "id": question_id,
+                        "label": label_text,
+                        "answer": "",
+                        "field_type": "LABEL"
+                    }
+                    section_data["questions"].append(question)
+                    question_id += 1
+        
+        # Fallback: create question from section if no form elements
+        if not section_data["questions"]:
+            question = {
+                "id": 0,
+                "label": section_name,
+                "answer": "",
+                "field_type": "SECTION"
+            }
+            section_data["questions"].append(question)
+       
+        sections.append(section_data)
+   
+    title_tag = tree.css_first('title')
+    title = title_tag.text().strip() if title_tag else _UNTITLED
+    
+    return {
+        "title": title,
+        "metadata": metadata,
+        "sections": sections
     }
+
+def _convert_with_bs4(html_content: str) -> Dict[str, Any]:
+    """Convert HTML content to JSON format using BeautifulSoup"""
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=STRAINER)
+   
+    # Extract metadata
+    metadata = {}
+    # Index the dcterms meta tags in one traversal, keeping the first of each name
+    meta_contents = {}
+    for meta_tag in soup.find_all('meta', attrs={'name': _META_NAMES}):
+        meta_contents.setdefault(meta_tag['name'], meta_tag.get('content'))
     
-    for key, meta_name in meta_fields.items():
-        meta_tag = soup.find('meta', {'name': meta_name})
-        metadata[key] = meta_tag['content'] if meta_tag and meta_tag.get('content') else None
+    for key, meta_name in _META_FIELDS.items():
+        content = meta_contents.get(meta_name)
+        metadata[key] = content if content else None
    
     # Extract sections
     sections = []
     for section in soup.find_all('section'):
+        # Collect headers, labels and textareas in a single pass over the section
+        header = None
+        textareas = []
+        labels = []
+        labels_by_for = {}
+        for element in section.descendants:
+            if element.name == 'textarea':
+                textareas.append(element)
+            elif element.name == 'label':
+                labels.append(element)
+                labels_by_for.setdefault(element.get('for'), element)
+            elif element.name == 'header' and header is None:
+                header = element
+        
         section_name = section.get('data-section-name')
         if not section_name:
-            header = section.find('header')
             section_name = header.text.strip() if header else f"Section {len(sections) + 1}"
         
         section_data = {
@@ -39,13 +206,14 @@ def convert_html_to_json(html_content: str) -> Dict[str, Any]:
         question_id = 0
         
         # Handle textareas (medical report style)
-        textareas = section.find_all('textarea')
         if textareas:
             for textarea in textareas:
                 textarea_id = textarea.get('id', '')
-                label_element = section.find('label', {'for': textarea_id})
-                label_text = label_element.text.strip() if label_element and label_element.text.strip() else section_name
-                default_content = textarea.text.strip() if textarea.text else ""
+                label_element = labels_by_for.get(textarea_id)
+                label_text = label_element.text.strip() if label_element else ""
+                if not label_text:
+                    label_text = section_name
+                default_content = textarea.text.strip()
                 
                 question = {
                     "id": question_id,
@@ -59,12 +227,12 @@ def convert_html_to_json(html_content: str) -> Dict[str, Any]:
         
         # Handle labels (original form style)
         else:
-            labels = section.find_all('label')
             for label in labels:
-                if label.text.strip():
+                label_text = label.text.strip()
+                if label_text:
                     question = {
                         "id": question_id,
-                        "label": label.text.strip(),
+                        "label": label_text,
                         "answer": "",
                         "field_type": "LABEL"
                     }
@@ -84,7 +252,7 @@ def convert_html_to_json(html_content: str) -> Dict[str, Any]:
         sections.append(section_data)
    
     title_tag = soup.find('title')
-    title = title_tag.text.strip() if title_tag else "Untitled Document"
+    title = title_tag.text.strip() if title_tag else _UNTITLED
     
     return {
         "title": title,
@@ -92,6 +260,20 @@ def convert_html_to_json(html_content: str) -> Dict[str, Any]:
         "sections": sections
     }
 
+def _convert_cached(html_bytes: bytes) -> bytes:
+    """Convert uploaded HTML bytes to serialized JSON, reusing cached results"""
+    key = hashlib.blake2b(html_bytes, digest_size=16).digest()
+    cached = _result_cache.get(key)
+    if cached is not None:
+        _result_cache.move_to_end(key)
+        return cached
+    
+    result = orjson.dumps(convert_html_to_json(html_bytes))
+    _result_cache[key] = result
+    if len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return result
+
 @app.post("/convert")
 async def convert_html_file(file: UploadFile = File(...)):
     """
@@ -109,31 +291,17 @@ async def convert_html_file(file: UploadFile = File(...)):
     try:
         # Read file content
         html_content = await file.read()
-        html_content = html_content.decode('utf-8')
         
         # Convert to JSON
-        result = convert_html_to_json(html_content)
-        
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "data": result
-        }
+        result = _convert_cached(html_content)
         
-    except UnicodeDecodeError:
-        try:
-            html_content = html_content.decode('latin-1')
-            result = convert_html_to_json(html_content)
-            return {
-                "status": "success", 
-                "filename": file.filename,
-                "data": result
-            }
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error decoding file: {str(e)}")
-    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+    
+    # Embed the already serialized result instead of serializing it again
+    content = (b'{"status":"success","filename":' + orjson.dumps(file.filename)
+               + b',"data":' + result + b'}')
+    return Response(content=content, media_type="application/json")
 
 @app.get("/")
 async def root():